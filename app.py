@@ -3,20 +3,49 @@ from __future__ import annotations
 
 from flask import (
     Flask, render_template, request, redirect, url_for,
-    flash, send_from_directory, jsonify, g, session, Response
+    flash, send_from_directory, jsonify, g, session, Response, has_app_context,
+    stream_with_context, abort
 )
 from pathlib import Path
-from io import BytesIO
-from functools import wraps
-import sqlite3, os, time, json, ast, re, collections
+from werkzeug.security import safe_join
+from functools import wraps, lru_cache
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait
+import sqlite3, os, time, json, ast, re, threading, queue, tempfile, csv, io, atexit, multiprocessing, hashlib, hmac, secrets
 from datetime import datetime, date
 
-from PIL import Image, ImageOps, ExifTags
+from PIL import Image, ExifTags, features
 from dateutil import parser as dtparser
 
+try:
+    import orjson  # optional: several times faster than the stdlib json module
+except ImportError:
+    orjson = None
+
+try:
+    import fcntl  # POSIX only: serialises schema setup across worker processes
+except ImportError:
+    fcntl = None
+
 import config as app_config
 
 
+if orjson is not None:
+    _json_loads = orjson.loads
+
+    def _json_dumpb(obj) -> bytes:
+        return orjson.dumps(obj)
+else:
+    _json_loads = json.loads
+
+    def _json_dumpb(obj) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _json_dumps(obj) -> str:
+    """Compact, non-ASCII-escaped JSON text (the form stored in *_json columns)."""
+    return _json_dumpb(obj).decode("utf-8")
+
+
 # -----------------------------------------------------------------------------
 # App / paths / constants (keep compatible with config.py expectations)
 # -----------------------------------------------------------------------------
@@ -25,6 +54,16 @@ APP_ROOT = Path(__file__).parent.resolve()
 
 UPLOAD_DIR = Path(os.environ.get("ARTCAP_UPLOAD_DIR", str(APP_ROOT / "uploads"))).expanduser().resolve()
 DB_PATH = Path(os.environ.get("ARTCAP_DB_PATH", str(APP_ROOT / "data" / "artifacts.db"))).expanduser().resolve()
+# Raw uploads (full EXIF, incl. GPS) wait here for the image workers. It must
+# not be under UPLOAD_DIR (which is public) but should share its filesystem so
+# finished derivatives can be renamed into place atomically.
+STAGING_DIR = Path(
+    os.environ.get("ARTCAP_STAGING_DIR", str(UPLOAD_DIR.parent / f"{UPLOAD_DIR.name}-staging"))
+).expanduser().resolve()
+# mkstemp creates 0600 files; published derivatives get the usual umask default
+# instead (read once here: os.umask() can only be read by setting it).
+_UMASK = os.umask(0)
+os.umask(_UMASK)
 
 ADMIN_USER = os.getenv("ARTCAP_ADMIN_USER", "admin")
 ADMIN_PASS = os.getenv("ARTCAP_ADMIN_PASS", "change-me")
@@ -32,8 +71,22 @@ APP_SECRET = os.getenv("ARTCAP_SECRET", "change-me")
 
 MAX_DIM = int(os.getenv("ARTCAP_MAX_DIM", "3000"))
 THUMB_DIM = int(os.getenv("ARTCAP_THUMB_DIM", "400"))
+# Small previews for the capture page's thumbnail strip (shown at <= 96px).
+MICRO_DIM = int(os.getenv("ARTCAP_MICRO_DIM", "96"))
 JPEG_QUALITY = int(os.getenv("ARTCAP_JPEG_QUALITY", "92"))
 WEBP_QUALITY = int(os.getenv("ARTCAP_WEBP_QUALITY", "85"))
+# libwebp effort 0-6: trades encode time for file size only (quality is WEBP_QUALITY).
+WEBP_METHOD = int(os.getenv("ARTCAP_WEBP_METHOD", "4"))
+DB_POOL_SIZE = int(os.getenv("ARTCAP_DB_POOL_SIZE", "5"))
+# Threads that build image derivatives after /submit has returned; 0 = do it inline.
+IMAGE_WORKERS = int(os.getenv("ARTCAP_IMAGE_WORKERS", str(os.cpu_count() or 2)))
+# Threads shared by all uploads (per process) for the JPG/WEBP/thumbnail encodes;
+# each image runs its three encodes side by side on this pool, and tasks from
+# different uploads interleave. Each task must own the Image it saves:
+# Image.save() mutates the instance, so two tasks never save the same one.
+ENCODE_WORKERS = max(1, int(os.getenv("ARTCAP_ENCODE_WORKERS", "4")))
+# Processes that do the decode/resize/encode for those threads; 0 = in the thread.
+IMAGE_PROCESSES = int(os.getenv("ARTCAP_IMAGE_PROCESSES", "0"))
 
 APP_BRAND = getattr(app_config, "APP_BRAND", "Artifact Capture")
 APP_SUBTITLE = getattr(app_config, "APP_SUBTITLE", "")
@@ -61,39 +114,61 @@ def _env_bool(name: str, default: bool = False) -> bool:
 
 
 GPS_ENABLED = _env_bool("ARTCAP_GPS_ENABLED", default=getattr(app_config, "GPS_ENABLED", False))
+# Hand file bodies to the front-end server (Apache mod_xsendfile) instead of streaming them from Python.
+USE_X_SENDFILE = _env_bool("ARTCAP_USE_X_SENDFILE", default=False)
+# Optimised Huffman tables save a few % of JPEG size for a second pass over
+# every encode; off by default so libjpeg-turbo encodes in a single pass.
+JPEG_OPTIMIZE = _env_bool("ARTCAP_JPEG_OPTIMIZE", default=False)
 
 
 # -----------------------------------------------------------------------------
 # Config normalization: build TYPE_META from config.object_types (unchanged schema)
 # -----------------------------------------------------------------------------
 
-def _parse_widget(widget_raw: str) -> tuple[str, list[str] | None]:
+_WIDGET_RE = re.compile(r"^(DROPDOWN|RADIO)\s*\((.*)\)\s*$", re.I | re.S)
+# The usual option list: plain quoted strings (no quotes, commas or escapes inside).
+_WIDGET_OPT = r"""(?:'[^'\\,]*'|"[^"\\,]*")"""
+_WIDGET_OPTS_RE = re.compile(rf"\s*{_WIDGET_OPT}\s*(?:,\s*{_WIDGET_OPT}\s*)*,?\s*")
+
+
+@lru_cache(maxsize=256)
+def _parse_widget(widget_raw: str) -> tuple[str, tuple[str, ...] | None]:
     """Parse DROPDOWN('a','b') / RADIO('a','b') strings from config.py."""
     widget_raw = (widget_raw or "").strip()
     if not widget_raw:
         return "text", None
 
-    up = widget_raw.upper()
-    if up.startswith("DROPDOWN"):
-        kind = "dropdown"
-    elif up.startswith("RADIO"):
-        kind = "radio"
-    else:
+    m = _WIDGET_RE.match(widget_raw)
+    if not m:
+        if widget_raw.upper().startswith(("DROPDOWN", "RADIO")):
+            raise RuntimeError(f"Could not parse widget spec {widget_raw!r} in config.py")
         return "text", None
+    kind = m.group(1).lower()
+
+    body = m.group(2)
+    if _WIDGET_OPTS_RE.fullmatch(body):
+        return kind, tuple(o.strip()[1:-1] for o in body.split(",") if o.strip())
 
     try:
-        start = widget_raw.index("(")
-        inside = widget_raw[start:]
-        vals = ast.literal_eval(inside)
+        vals = ast.literal_eval(f"({body})")
         if isinstance(vals, (list, tuple)):
-            options = [str(v) for v in vals]
+            options = tuple(str(v) for v in vals)
         else:
-            options = [str(vals)]
+            options = (str(vals),)
         return kind, options
     except Exception as e:
         raise RuntimeError(f"Could not parse widget spec {widget_raw!r} in config.py") from e
 
 
+def _widget_spec(widget_raw) -> tuple[str, tuple[str, ...] | None]:
+    """A field's widget: ("dropdown"|"radio", [options]) as-is, or a string for _parse_widget."""
+    if isinstance(widget_raw, (tuple, list)):
+        if len(widget_raw) == 2 and str(widget_raw[0]).lower() in ("dropdown", "radio"):
+            return str(widget_raw[0]).lower(), tuple(str(v) for v in widget_raw[1])
+        raise RuntimeError(f"Could not parse widget spec {widget_raw!r} in config.py")
+    return _parse_widget(widget_raw)
+
+
 OBJECT_TYPES = getattr(app_config, "object_types", None) or {}
 if not isinstance(OBJECT_TYPES, dict) or not OBJECT_TYPES:
     raise RuntimeError("config.py must define a non-empty dict named object_types")
@@ -101,12 +176,26 @@ if not isinstance(OBJECT_TYPES, dict) or not OBJECT_TYPES:
 SYSTEM_COLUMNS = {
     "id",
     "gps_lat", "gps_lon", "gps_alt", "gps_acc",
-    "thumbs_json", "images_json", "webps_json", "json_files_json",
+    "thumbs_json", "images_json", "webps_json", "json_files_json", "micros_json",
     "date_last_saved", "date_recorded", "date_updated",
 }
 
 TYPE_META: dict[str, dict] = {}
 
+
+def _form_kind(widget: str, sql_type: str) -> str:
+    """How _coerce_form_values treats a field (widget wins over SQL type)."""
+    if widget in ("constant", "radio"):
+        return widget
+    if sql_type == "DATE":
+        return "date"
+    if sql_type == "TIMESTAMP":
+        return "timestamp"
+    if widget == "uppercase" or sql_type == "UPPERCASE":
+        return "upper"
+    return "text"
+
+
 for otype, cfg in OBJECT_TYPES.items():
     label = cfg.get("label") or otype.title()
     input_fields = cfg.get("input_fields") or []
@@ -137,7 +226,7 @@ for otype, cfg in OBJECT_TYPES.items():
             sql_type_str = "TEXT"
         else:
             widget_raw = f[3] if len(f) > 3 else ""
-            widget, options = _parse_widget(widget_raw)
+            widget, options = _widget_spec(widget_raw)
             sqlite_type = sql_type_str
 
         # server-managed timestamps
@@ -165,6 +254,7 @@ for otype, cfg in OBJECT_TYPES.items():
         "input_fields": input_fields,
         "field_meta": field_meta,
         "index_fields": list(cfg.get("index") or []),
+        "required_fields": required_fields,
         "result_rows": cfg.get("result_rows") or cfg.get("layout_rows") or [],
         "layout_rows": cfg.get("layout_rows") or [],
         "fields_to_reset": cfg.get("fields_to_reset") or [],
@@ -173,6 +263,64 @@ for otype, cfg in OBJECT_TYPES.items():
         "result_grid": cfg.get("result_grid") or [],
     }
 
+    # Parallel per-field arrays (in input_fields order) for _coerce_form_values,
+    # so a submit walks flat tuples instead of re-reading field_meta dicts.
+    _form_cols = tuple(f[1] for f in input_fields)
+    _form_types = tuple(str((f[2] if len(f) > 2 else "TEXT") or "TEXT").strip().upper() for f in input_fields)
+    _form_widgets = tuple(field_meta[c]["widget"] for c in _form_cols)
+    TYPE_META[otype].update({
+        "form_cols": _form_cols,
+        "form_types": _form_types,
+        "form_widgets": _form_widgets,
+        "form_constants": tuple(str(field_meta[c]["constant_value"] or "") for c in _form_cols),
+        "form_server_now": tuple(field_meta[c]["server_now"] for c in _form_cols),
+        "server_now_cols": tuple(c for c, fm in field_meta.items() if fm["server_now"]),
+        # One coercion kind per field, resolved here from widget + SQL type.
+        "form_kinds": tuple(_form_kind(w, t) for w, t in zip(_form_widgets, _form_types)),
+        "date_cols": frozenset(c for c, fm in field_meta.items() if fm["sql_type"].upper() == "DATE"),
+    })
+
+    # INSERT statement for _insert_record_only: the form columns are fixed per
+    # type (date_recorded/date_updated are the only system columns a form sets),
+    # followed by the server-managed columns.
+    _insert_cols = tuple(
+        c for c in dict.fromkeys(_form_cols)
+        if c not in SYSTEM_COLUMNS or c in ("date_recorded", "date_updated")
+    )
+    _insert_sql_cols = [c if c in SYSTEM_COLUMNS else f'"{c}"' for c in _insert_cols] + [
+        "thumbs_json", "images_json", "webps_json", "json_files_json", "micros_json", "date_last_saved",
+        "gps_lat", "gps_lon", "gps_alt", "gps_acc",
+    ]
+    TYPE_META[otype]["insert_cols"] = _insert_cols
+    TYPE_META[otype]["insert_sql"] = (
+        f"INSERT INTO {otype} ({', '.join(_insert_sql_cols)}) VALUES ({','.join(['?'] * len(_insert_sql_cols))})"
+    )
+    # Fixed per-type statements used by the routes, built once so every request
+    # hands sqlite3 the same string (and hits its statement cache).
+    TYPE_META[otype].update({
+        "select_sql": f"SELECT * FROM {otype} WHERE id=?",
+        "id_sql": f"SELECT id FROM {otype} WHERE id=?",
+        "files_sql": (
+            f"SELECT thumbs_json, images_json, webps_json, json_files_json, micros_json FROM {otype} WHERE id=?"
+        ),
+        "delete_sql": f"DELETE FROM {otype} WHERE id=?",
+        "set_images_sql": (
+            f"UPDATE {otype} SET thumbs_json=?, images_json=?, webps_json=?, micros_json=?, date_last_saved=? "
+            f"WHERE id=?"
+        ),
+        "export_sql": f"SELECT * FROM {otype} ORDER BY id ASC",
+    })
+    # Browse search without FTS5: one LIKE per user column (each bound to the
+    # same pattern), OR'ed onto the id match.
+    _like_cols = [c for c in field_meta
+                  if c not in ("thumbs_json", "images_json", "webps_json", "json_files_json", "micros_json")]
+    TYPE_META[otype]["search_like_sql"] = "".join(f' OR CAST("{c}" AS TEXT) LIKE ?' for c in _like_cols)
+    TYPE_META[otype]["search_like_count"] = len(_like_cols)
+
+
+# Fallback type for requests that name none (or an unknown one).
+DEFAULT_OTYPE = next(iter(TYPE_META))
+
 
 # Compute result_fields (used by table/grid renderers) from result_rows/layout_rows.
 for _otype, _m in TYPE_META.items():
@@ -190,7 +338,7 @@ for _otype, _m in TYPE_META.items():
                 continue
             seen.add(col)
             # Exclude image/json system columns from the textual table fields
-            if col in ("thumbs_json", "images_json", "webps_json", "json_files_json"):
+            if col in ("thumbs_json", "images_json", "webps_json", "json_files_json", "micros_json"):
                 continue
             if col in ("gps_lat", "gps_lon", "gps_alt", "gps_acc"):
                 continue
@@ -205,8 +353,13 @@ for _otype, _m in TYPE_META.items():
 
 app = Flask(__name__, root_path=str(APP_ROOT))
 app.secret_key = APP_SECRET
+app.config["USE_X_SENDFILE"] = USE_X_SENDFILE
+# /static and the favicon: browsers reuse them for a day, then revalidate
+# against the ETag (a 304). Not immutable: the URLs aren't versioned, so an
+# updated app.js/app.css must still reach clients.
+app.config["SEND_FILE_MAX_AGE_DEFAULT"] = 86400
 
-app.jinja_env.filters["fromjson"] = lambda s: json.loads(s) if s else []
+app.jinja_env.filters["fromjson"] = lambda s: _json_loads(s) if s else []
 
 
 def maps_links(lat, lon):
@@ -225,7 +378,13 @@ def make_banner_title(title: str | None) -> str:
 
 
 def _nav_links(active: str):
-    # Only 3 navlinks are public
+    # Only 3 navlinks are public. url_for() only varies with the mount point,
+    # so the list is built once per (active, script_root).
+    return _nav_links_for(active, request.script_root)
+
+
+@lru_cache(maxsize=64)
+def _nav_links_for(active: str, script_root: str):
     return [
         {"label": "Upload", "url": url_for("form"), "active": active == "upload"},
         {"label": "Browse", "url": url_for("browse"), "active": active == "browse"},
@@ -233,36 +392,83 @@ def _nav_links(active: str):
     ]
 
 
-@app.context_processor
-def inject_globals():
-    return {
-        "APP_BRAND": APP_BRAND,
-        "APP_SUBTITLE": APP_SUBTITLE,
-        "APP_LOGO": APP_LOGO,
-        "ADMIN_LABEL": ADMIN_LABEL,
-        "DATE_FORMAT": DATE_FORMAT,
-        "TIMESTAMP_FORMAT": TIMESTAMP_FORMAT,
-        "BANNER_BG": BANNER_BG,
-        "BANNER_FG": BANNER_FG,
-        "BANNER_ACCENT": BANNER_ACCENT,
-        "SHOW_LOGO": SHOW_LOGO,
-        "OBJECT_TYPES": TYPE_META,
-        "TYPE_META": TYPE_META,
-        "GPS_ENABLED": GPS_ENABLED,
-        "grid_max_width": GRID_MAX_WIDTH,
-    }
+# Static for the life of the process: set once on the Jinja environment rather
+# than merged into every render by a context processor.
+app.jinja_env.globals.update({
+    "APP_BRAND": APP_BRAND,
+    "APP_SUBTITLE": APP_SUBTITLE,
+    "APP_LOGO": APP_LOGO,
+    "ADMIN_LABEL": ADMIN_LABEL,
+    "DATE_FORMAT": DATE_FORMAT,
+    "TIMESTAMP_FORMAT": TIMESTAMP_FORMAT,
+    "BANNER_BG": BANNER_BG,
+    "BANNER_FG": BANNER_FG,
+    "BANNER_ACCENT": BANNER_ACCENT,
+    "SHOW_LOGO": SHOW_LOGO,
+    "OBJECT_TYPES": TYPE_META,
+    "TYPE_META": TYPE_META,
+    "GPS_ENABLED": GPS_ENABLED,
+    "grid_max_width": GRID_MAX_WIDTH,
+})
 
 
 # -----------------------------------------------------------------------------
 # DB
 # -----------------------------------------------------------------------------
 
+# Applied once to every new connection. WAL lets Browse readers proceed while
+# an upload/edit is writing, and synchronous=NORMAL only fsyncs at checkpoints.
+_DB_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-20000",
+)
+
+
+# Connections are reused across requests rather than opened/closed each time.
+# The pool is per process; a worker forked after import starts with a fresh one.
+_DB_POOL: queue.Queue = queue.Queue(maxsize=DB_POOL_SIZE)
+_DB_POOL_PID = os.getpid()
+
+
+def _open_db() -> sqlite3.Connection:
+    DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(DB_PATH), check_same_thread=False, cached_statements=256)
+    conn.row_factory = sqlite3.Row
+    if str(DB_PATH) != ":memory:":
+        for pragma in _DB_PRAGMAS:
+            conn.execute(pragma)
+    return conn
+
+
+def _checkout_db() -> sqlite3.Connection:
+    global _DB_POOL, _DB_POOL_PID
+    if _DB_POOL_PID != os.getpid():
+        _DB_POOL = queue.Queue(maxsize=DB_POOL_SIZE)
+        _DB_POOL_PID = os.getpid()
+    try:
+        return _DB_POOL.get_nowait()
+    except queue.Empty:
+        return _open_db()
+
+
+def _checkin_db(conn: sqlite3.Connection):
+    try:
+        if conn.in_transaction:
+            conn.rollback()
+        if _DB_POOL_PID == os.getpid():
+            _DB_POOL.put_nowait(conn)
+            return
+    except (queue.Full, sqlite3.Error):
+        pass
+    conn.close()
+
+
 def get_db() -> sqlite3.Connection:
     if "db" not in g:
-        DB_PATH.parent.mkdir(parents=True, exist_ok=True)
-        conn = sqlite3.connect(str(DB_PATH))
-        conn.row_factory = sqlite3.Row
-        g.db = conn
+        g.db = _checkout_db()
     return g.db
 
 
@@ -270,7 +476,43 @@ def get_db() -> sqlite3.Connection:
 def _close_db(exc):
     conn = g.pop("db", None)
     if conn is not None:
-        conn.close()
+        _checkin_db(conn)
+
+
+@atexit.register
+def _close_pool():
+    # Close idle pooled connections on shutdown so the last one out
+    # checkpoints the WAL back into the database file.
+    if _DB_POOL_PID != os.getpid():
+        return
+    while True:
+        try:
+            _DB_POOL.get_nowait().close()
+        except queue.Empty:
+            break
+        except sqlite3.Error:
+            pass
+
+
+_COL_DECL_RE = re.compile(r'^"?([A-Za-z0-9_]+)"?\s+')
+
+
+# Bump when init_db() starts creating different tables/columns/indexes.
+_SCHEMA_REV = 1
+
+
+def _schema_version() -> int:
+    """Fingerprint of the schema init_db() builds from config, for PRAGMA user_version."""
+    spec = [_SCHEMA_REV]
+    for otype, meta in TYPE_META.items():
+        spec.append((
+            otype,
+            [(col, fm["sqlite_type"]) for col, fm in meta["field_meta"].items()],
+            list(meta["index_fields"]),
+            list(meta["required_fields"]),
+        ))
+    digest = hashlib.sha1(repr(spec).encode("utf-8")).digest()
+    return int.from_bytes(digest[:4], "big") & 0x7FFFFFFF or 1
 
 
 def init_db():
@@ -284,63 +526,176 @@ def init_db():
         except Exception:
             return set()
 
-    def _ensure_column(table: str, col: str, decl: str):
-        existing = _table_columns(table)
-        if col in existing:
-            return
-        conn.execute(f"ALTER TABLE {table} ADD COLUMN {decl}")
-
     conn = get_db()
-    for otype, meta in TYPE_META.items():
-        # Build the canonical schema for every table.
-        # IMPORTANT: GPS columns must *always* exist so databases can be
-        # imported/exported between GPS-enabled and non-GPS builds.
-        cols = []
-        cols.append("id INTEGER PRIMARY KEY AUTOINCREMENT")
-        cols += [
-            "gps_lat REAL",
-            "gps_lon REAL",
-            "gps_alt REAL",
-            "gps_acc REAL",
-            "thumbs_json TEXT",
-            "images_json TEXT",
-            "webps_json TEXT",
-            "json_files_json TEXT",
-            "date_last_saved TEXT",
-        ]
-
-        for col, fm in meta["field_meta"].items():
-            if col in SYSTEM_COLUMNS:
-                # keep schema compatibility; these may appear in input_fields but are server-managed
-                if col == "date_recorded":
-                    cols.append("date_recorded TEXT")
-                elif col == "date_updated":
-                    cols.append("date_updated TEXT")
-                continue
-            cols.append(f'"{col}" {fm["sqlite_type"]}')
-
-        ddl = f"CREATE TABLE IF NOT EXISTS {otype} ({', '.join(cols)})"
-        conn.execute(ddl)
-
-        # Lightweight migration: if the table already exists, add any missing
-        # columns (e.g., when GPS columns were previously omitted).
-        existing = _table_columns(otype)
-        if existing:
-            for decl in cols[1:]:  # skip id
-                # decl can be like: gps_lat REAL or "col" TEXT
-                m = re.match(r'^"?([A-Za-z0-9_]+)"?\s+.+$', decl)
-                if not m:
+    version = _schema_version()
+    if conn.execute("PRAGMA user_version").fetchone()[0] == version:
+        # Already built for this config (by an earlier start or another worker).
+        names = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+        _FTS_TABLES.update(otype for otype in TYPE_META if f"{otype}_fts" in names)
+        return
+
+    # All of the DDL below is one transaction: one commit (and fsync) on a
+    # fresh database or migration instead of one per statement.
+    conn.execute("BEGIN")
+    try:
+        for otype, meta in TYPE_META.items():
+            # Build the canonical schema for every table.
+            # IMPORTANT: GPS columns must *always* exist so databases can be
+            # imported/exported between GPS-enabled and non-GPS builds.
+            cols = []
+            cols.append("id INTEGER PRIMARY KEY AUTOINCREMENT")
+            cols += [
+                "gps_lat REAL",
+                "gps_lon REAL",
+                "gps_alt REAL",
+                "gps_acc REAL",
+                "thumbs_json TEXT",
+                "images_json TEXT",
+                "webps_json TEXT",
+                "json_files_json TEXT",
+                "micros_json TEXT",
+                "date_last_saved TEXT",
+            ]
+
+            for col, fm in meta["field_meta"].items():
+                if col in SYSTEM_COLUMNS:
+                    # keep schema compatibility; these may appear in input_fields but are server-managed
+                    if col == "date_recorded":
+                        cols.append("date_recorded TEXT")
+                    elif col == "date_updated":
+                        cols.append("date_updated TEXT")
                     continue
-                c = m.group(1)
-                if c not in existing:
-                    _ensure_column(otype, c, decl)
+                cols.append(f'"{col}" {fm["sqlite_type"]}')
+
+            ddl = f"CREATE TABLE IF NOT EXISTS {otype} ({', '.join(cols)})"
+            conn.execute(ddl)
+
+            # Lightweight migration: if the table already exists, add any missing
+            # columns (e.g., when GPS columns were previously omitted).
+            existing = _table_columns(otype)
+            if existing:
+                for decl in cols[1:]:  # skip id
+                    # decl can be like: gps_lat REAL or "col" TEXT
+                    m = _COL_DECL_RE.match(decl)
+                    if not m:
+                        continue
+                    if m.group(1) not in existing:
+                        conn.execute(f"ALTER TABLE {otype} ADD COLUMN {decl}")
+
+            # Indexes backing /exists lookups (equality on the user fields).
+            user_cols = [c for c in meta["field_meta"] if c not in SYSTEM_COLUMNS]
+            for col in meta["index_fields"]:
+                if col in user_cols:
+                    conn.execute(f'CREATE INDEX IF NOT EXISTS "idx_{otype}_{col}" ON {otype} ("{col}")')
+                    # Matches browse()'s index-mode ORDER BY so pages come off the
+                    # index instead of a full sort.
+                    conn.execute(
+                        f'CREATE INDEX IF NOT EXISTS "ix_{otype}_{col}" ON {otype} '
+                        f'(LOWER(TRIM(CAST("{col}" AS TEXT))), id DESC)'
+                    )
+            required = [c for c in meta["required_fields"] if c in user_cols]
+            if len(required) > 1:
+                conn.execute(
+                    f'CREATE INDEX IF NOT EXISTS "idx_{otype}_required" ON {otype} ('
+                    + ", ".join(f'"{c}"' for c in required) + ")"
+                )
+
+            # Partial index over just the geotagged rows, in export (id) order,
+            # for the GeoJSON export (which the map page loads).
+            conn.execute(
+                f'CREATE INDEX IF NOT EXISTS "idx_{otype}_gps" ON {otype} (id) '
+                "WHERE gps_lat IS NOT NULL AND gps_lon IS NOT NULL"
+            )
 
-    conn.commit()
+            _ensure_fts(conn, otype, meta)
+        conn.execute(f"PRAGMA user_version={version}")
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.rollback()
+        raise
 
 
-@app.before_request
-def _ensure_db():
-    init_db()
+# Tables whose FTS5 search index is in place (filled by init_db). Browse falls
+# back to LIKE scans for other tables or if this SQLite lacks FTS5/trigram.
+_FTS_TABLES: set[str] = set()
+
+
+def _ensure_fts(conn: sqlite3.Connection, otype: str, meta: dict):
+    """Create/refresh the external-content FTS5 table used by Browse search.
+
+    The trigram tokenizer keeps the old substring (LIKE '%q%') semantics for
+    queries of 3+ characters. Triggers keep it in sync with the base table;
+    the update trigger only fires for the indexed columns, so image-list and
+    timestamp updates don't touch the index.
+    """
+    fts = f"{otype}_fts"
+    cols = [c for c in meta["field_meta"]
+            if c not in ("thumbs_json", "images_json", "webps_json", "json_files_json", "micros_json")]
+    existing = [r[1] for r in conn.execute(f"PRAGMA table_info({fts})").fetchall()]
+    if existing == cols:
+        _FTS_TABLES.add(otype)
+        return
+
+    col_list = ", ".join(f'"{c}"' for c in cols)
+    new_vals = ", ".join(f'new."{c}"' for c in cols)
+    old_vals = ", ".join(f'old."{c}"' for c in cols)
+    try:
+        for suffix in ("ai", "ad", "au"):
+            conn.execute(f"DROP TRIGGER IF EXISTS {fts}_{suffix}")
+        conn.execute(f"DROP TABLE IF EXISTS {fts}")
+        conn.execute(
+            f"CREATE VIRTUAL TABLE {fts} USING fts5({col_list}, "
+            f"content='{otype}', content_rowid='id', tokenize='trigram')"
+        )
+    except sqlite3.OperationalError:
+        app.logger.warning("SQLite FTS5 trigram search unavailable; Browse search on %s uses LIKE.", otype)
+        return
+    conn.execute(
+        f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {otype} BEGIN "
+        f"INSERT INTO {fts}(rowid, {col_list}) VALUES (new.id, {new_vals}); END"
+    )
+    conn.execute(
+        f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {otype} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {col_list}) VALUES ('delete', old.id, {old_vals}); END"
+    )
+    conn.execute(
+        f"CREATE TRIGGER {fts}_au AFTER UPDATE OF {col_list} ON {otype} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {col_list}) VALUES ('delete', old.id, {old_vals}); "
+        f"INSERT INTO {fts}(rowid, {col_list}) VALUES (new.id, {new_vals}); END"
+    )
+    conn.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+    _FTS_TABLES.add(otype)
+
+
+_SCHEMA_LOCK = threading.Lock()
+_SCHEMA_READY = False
+
+
+def ensure_schema():
+    """Run init_db() once per process (not on every request)."""
+    global _SCHEMA_READY
+    if _SCHEMA_READY:
+        return
+    with _SCHEMA_LOCK:
+        if _SCHEMA_READY:
+            return
+        with app.app_context():
+            if fcntl is None:
+                init_db()
+            else:
+                # Workers importing the app at the same time take turns; all
+                # but the first then find user_version current and return.
+                DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+                with open(DB_PATH.with_name(DB_PATH.name + ".initlock"), "a+") as lock:
+                    fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+                    try:
+                        init_db()
+                    finally:
+                        fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+        _SCHEMA_READY = True
+
+
+ensure_schema()
 
 
 # -----------------------------------------------------------------------------
@@ -366,7 +721,11 @@ def account():
     if request.method == "POST":
         u = (request.form.get("username") or "").strip()
         p = (request.form.get("password") or "").strip()
-        if u == ADMIN_USER and p == ADMIN_PASS:
+        # Constant-time, and both are always compared, so response timing
+        # says nothing about how much of either matched.
+        user_ok = hmac.compare_digest(u.encode("utf-8"), ADMIN_USER.encode("utf-8"))
+        pass_ok = hmac.compare_digest(p.encode("utf-8"), ADMIN_PASS.encode("utf-8"))
+        if user_ok and pass_ok:
             session["is_admin"] = True
             flash("Logged in.")
             nxt = request.args.get("next") or url_for("browse")
@@ -387,12 +746,16 @@ def logout():
 # -----------------------------------------------------------------------------
 
 _DIGITS_ONLY = re.compile(r"^\d{6,8}$")
+_ISO_DATE = re.compile(r"^(\d{4})-(\d{2})-(\d{2})$")
+_DMY_DATE = re.compile(r"^(\d{1,2})[/-](\d{1,2})[/-](\d{4})$")
 
 
 def parse_user_date(raw: str) -> str | None:
     """Accepts flexible user date input; returns ISO date (YYYY-MM-DD) or None.
 
     Heuristics:
+      - YYYY-MM-DD: taken as-is (the stored form, e.g. an Edit round-trip)
+      - DD/MM/YYYY or DD-MM-YYYY
       - 6 digits: DDMMYY (e.g. 020286 -> 1986-02-02)
       - 8 digits: DDMMYYYY
       - otherwise: dateutil parser with dayfirst=True
@@ -402,6 +765,24 @@ def parse_user_date(raw: str) -> str | None:
     s = str(raw).strip()
     if not s:
         return None
+    return _parse_date_str(s)
+
+
+@lru_cache(maxsize=1024)
+def _parse_date_str(s: str) -> str:
+    m = _ISO_DATE.match(s)
+    if m:
+        try:
+            return date(int(m.group(1)), int(m.group(2)), int(m.group(3))).isoformat()
+        except ValueError:
+            pass  # let dateutil have a go
+
+    m = _DMY_DATE.match(s)
+    if m:
+        try:
+            return date(int(m.group(3)), int(m.group(2)), int(m.group(1))).isoformat()
+        except ValueError:
+            pass  # e.g. 02/13/1986: dateutil swaps day and month
 
     if _DIGITS_ONLY.match(s):
         if len(s) == 6:
@@ -418,7 +799,13 @@ def parse_user_date(raw: str) -> str | None:
 
 
 def now_timestamp() -> str:
-    return datetime.now().strftime("%Y-%m-%dT%H:%M:%S")
+    """Current local time as YYYY-MM-DDTHH:MM:SS, computed once per request."""
+    if not has_app_context():
+        return datetime.now().isoformat(timespec="seconds")
+    ts = g.get("now_ts")
+    if ts is None:
+        ts = g.now_ts = datetime.now().isoformat(timespec="seconds")
+    return ts
 
 
 # -----------------------------------------------------------------------------
@@ -426,78 +813,251 @@ def now_timestamp() -> str:
 # -----------------------------------------------------------------------------
 
 _EXIF_TAGS = {v: k for k, v in ExifTags.TAGS.items()}
+_GPS_TAG = _EXIF_TAGS.get("GPSInfo", 34853)
+# Keys inside the GPS sub-IFD
+_GPS_TAGS = {v: k for k, v in ExifTags.GPSTAGS.items()}
+_GPS_LAT_REF = _GPS_TAGS.get("GPSLatitudeRef", 1)
+_GPS_LAT = _GPS_TAGS.get("GPSLatitude", 2)
+_GPS_LON_REF = _GPS_TAGS.get("GPSLongitudeRef", 3)
+_GPS_LON = _GPS_TAGS.get("GPSLongitude", 4)
+_GPS_ALT = _GPS_TAGS.get("GPSAltitude", 6)
+
+# Every upload is JPEG-decoded and re-encoded; stock libjpeg is several times
+# slower at this than libjpeg-turbo (which Pillow's binary wheels bundle).
+if not features.check_feature("libjpeg_turbo"):
+    app.logger.warning("Pillow is not linked against libjpeg-turbo; image uploads will be slower.")
+
+_ORIENTATION_TAG = _EXIF_TAGS.get("Orientation", 0x0112)
+# EXIF orientation -> the transpose that makes the image upright (as ImageOps.exif_transpose).
+_ORIENTATION_TRANSPOSE = {
+    2: Image.Transpose.FLIP_LEFT_RIGHT,
+    3: Image.Transpose.ROTATE_180,
+    4: Image.Transpose.FLIP_TOP_BOTTOM,
+    5: Image.Transpose.TRANSPOSE,
+    6: Image.Transpose.ROTATE_270,
+    7: Image.Transpose.TRANSVERSE,
+    8: Image.Transpose.ROTATE_90,
+}
 
+# 4:2:0 chroma subsampling, baseline (non-progressive) scan: the fast turbo encode path.
+_JPEG_SAVE_OPTS = {"subsampling": 2, "progressive": False, "optimize": JPEG_OPTIMIZE}
 
-def _save_derivatives(img: Image.Image, stem: str) -> tuple[str, str, str]:
-    """Save main JPG, WEBP, and thumbnail JPG. Returns (jpg, webp, thumb) basenames."""
-    UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
 
-    # normalize orientation
-    img = ImageOps.exif_transpose(img)
+# Like _DB_POOL, the executors are per process: one created before a fork
+# (e.g. gunicorn --preload) has no threads in the child, so it gets a new one.
+_ENCODE_POOL: ThreadPoolExecutor | None = None
+_ENCODE_POOL_PID = 0
+_ENCODE_POOL_LOCK = threading.Lock()
 
-    # scale down large images
-    img = img.convert("RGB")
+
+def _encode_pool() -> ThreadPoolExecutor:
+    global _ENCODE_POOL, _ENCODE_POOL_PID
+    if _ENCODE_POOL is None or _ENCODE_POOL_PID != os.getpid():
+        with _ENCODE_POOL_LOCK:
+            if _ENCODE_POOL is None or _ENCODE_POOL_PID != os.getpid():
+                _ENCODE_POOL = ThreadPoolExecutor(max_workers=ENCODE_WORKERS, thread_name_prefix="artcap-enc")
+                _ENCODE_POOL_PID = os.getpid()
+    return _ENCODE_POOL
+
+
+def _strip_jpeg_app1(data: bytes) -> bytes | None:
+    """Drop the APP1 (EXIF/XMP) segments from a JPEG; None if it doesn't parse."""
+    if data[:2] != b"\xff\xd8":
+        return None
+    out = [data[:2]]
+    i, n = 2, len(data)
+    while i + 4 <= n:
+        if data[i] != 0xFF:
+            return None
+        marker = data[i + 1]
+        if marker == 0xFF:  # fill byte
+            i += 1
+            continue
+        if marker == 0xDA:  # start of scan: the rest is image data
+            out.append(data[i:])
+            return b"".join(out)
+        seg_end = i + 2 + int.from_bytes(data[i + 2:i + 4], "big")
+        if seg_end > n:
+            return None
+        if marker != 0xE1:
+            out.append(data[i:seg_end])
+        i = seg_end
+    return None
+
+
+def _save_derivatives(img: Image.Image, stem: str, exif: Image.Exif | None = None,
+                      source=None) -> tuple[str, str, str, str]:
+    """Save main JPG, WEBP, thumbnail and micro-thumbnail JPGs. Returns (jpg, webp, thumb, micro) basenames.
+
+    The upload is decoded once; the thumbnail is resampled from the resized
+    main image. Pass `exif` if the caller already read it from `img`, and the
+    upload's path as `source` to let an already small, upright RGB JPEG be
+    copied (minus its EXIF) as the main image instead of re-encoded.
+    """
+    UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+    # Decided on the upload's own size: draft() below may shrink the decoded
+    # image to exactly MAX_DIM, but the source bytes stay full size.
+    orig_w, orig_h = img.size
+    passthrough = (source is not None and img.format == "JPEG" and img.mode == "RGB"
+                   and max(orig_w, orig_h) <= MAX_DIM)
+
+    # For a not-yet-loaded JPEG, let libjpeg scale by 1/2..1/8 while decoding
+    # as far as that still leaves at least the final size.
+    w, h = orig_w, orig_h
+    if img.format == "JPEG" and max(w, h) > MAX_DIM:
+        passthrough = False
+        scale = MAX_DIM / float(max(w, h))
+        img.draft("RGB", (int(w * scale), int(h * scale)))
+
+    # normalize orientation (derivatives are saved without EXIF, so the tag
+    # itself needn't be rewritten)
+    if exif is None:
+        exif = img.getexif()
+    transpose = _ORIENTATION_TRANSPOSE.get(exif.get(_ORIENTATION_TAG))
+    if transpose is not None:
+        passthrough = False
+        img = img.transpose(transpose)
+
+    # scale down large images (in RGB: Pillow-SIMD's vectorised resamplers,
+    # if installed in place of Pillow, skip palette/other modes)
+    if img.mode != "RGB":
+        img = img.convert("RGB")
     w, h = img.size
     if max(w, h) > MAX_DIM:
+        passthrough = False
         scale = MAX_DIM / float(max(w, h))
-        img = img.resize((int(w * scale), int(h * scale)))
+        # reducing_gap: box-reduce to within 3x of the target first (mostly
+        # non-JPEG sources, which draft() above can't shrink), then LANCZOS
+        img = img.resize((int(w * scale), int(h * scale)), Image.Resampling.LANCZOS, reducing_gap=3.0)
 
     jpg_name = f"{stem}.jpg"
     webp_name = f"{stem}.webp"
     thumb_name = f"{stem}.thumb.jpg"
+    micro_name = f"{stem}.micro.jpg"
 
-    jpg_path = UPLOAD_DIR / jpg_name
-    webp_path = UPLOAD_DIR / webp_name
-    thumb_path = UPLOAD_DIR / thumb_name
+    # Everything is written as .part files under STAGING_DIR (same filesystem)
+    # and renamed into UPLOAD_DIR at the end, so /uploads never serves (and
+    # browsers never cache for a year) a half-written file.
+    # Each part is a fresh mkstemp file, so concurrent jobs never share one.
+    STAGING_DIR.mkdir(parents=True, exist_ok=True)
 
-    img.save(jpg_path, format="JPEG", quality=JPEG_QUALITY, optimize=True)
+    def _part(name: str) -> Path:
+        fd, path = tempfile.mkstemp(prefix=f"{name}.", suffix=".part", dir=str(STAGING_DIR))
+        try:
+            os.fchmod(fd, 0o666 & ~_UMASK)
+        finally:
+            os.close(fd)
+        return Path(path)
+
+    thumb_webp_name = _thumb_webp_name(thumb_name)
+    jpg_path = _part(jpg_name)
+    webp_path = _part(webp_name)
+    thumb_path = _part(thumb_name)
+    micro_path = _part(micro_name)
+    thumb_webp_path = _part(thumb_webp_name)
+
+    def _save_jpg():
+        if passthrough:
+            # Already the right size and orientation: keep the original JPEG
+            # (no generation loss, no encode) but never publish its EXIF/GPS.
+            data = _strip_jpeg_app1(Path(source).read_bytes())
+            if data is not None:
+                jpg_path.write_bytes(data)
+                return
+        img.save(jpg_path, format="JPEG", quality=JPEG_QUALITY, **_JPEG_SAVE_OPTS)
+
+    def _save_webp():
+        try:
+            webp_img.save(webp_path, format="WEBP", quality=WEBP_QUALITY, method=WEBP_METHOD)
+            return webp_name
+        except Exception:
+            # WEBP is optional
+            return ""
 
+    def _save_thumb():
+        # thumbnail, from the already decoded and resized RGB image
+        w, h = img.size
+        scale = min(THUMB_DIM / float(w), THUMB_DIM / float(h), 1.0)
+        t = img.resize(
+            (max(1, round(w * scale)), max(1, round(h * scale))), Image.Resampling.LANCZOS, reducing_gap=2.0
+        )
+        t.save(thumb_path, format="JPEG", quality=85, **_JPEG_SAVE_OPTS)
+        try:
+            # served instead of the JPEG to browsers that accept WEBP (see serve_upload)
+            t.save(thumb_webp_path, format="WEBP", quality=WEBP_QUALITY, method=WEBP_METHOD)
+        except Exception:
+            thumb_webp_path.unlink(missing_ok=True)
+
+        # micro-thumbnail, from the thumbnail (a few KB at Q60)
+        w, h = t.size
+        scale = min(MICRO_DIM / float(w), MICRO_DIM / float(h), 1.0)
+        m = t.resize((max(1, round(w * scale)), max(1, round(h * scale))), Image.Resampling.LANCZOS)
+        m.save(micro_path, format="JPEG", quality=60, **_JPEG_SAVE_OPTS)
+
+    # The encodes release the GIL inside libjpeg/libwebp, so they run side by
+    # side. Image.save() is not read-only (it sets encoderinfo/encoderconfig on
+    # the instance), so the WEBP encode saves its own copy while the JPEG one
+    # saves `img`; the thumbnail task only reads `img` and saves its own
+    # resized images. Load the pixels first so nothing races to decode a
+    # still-lazy image.
+    img.load()
+    webp_img = img.copy()
+    pool = _encode_pool()
+    jpg_f = pool.submit(_save_jpg)
+    webp_f = pool.submit(_save_webp)
+    thumb_f = pool.submit(_save_thumb)
     try:
-        img.save(webp_path, format="WEBP", quality=WEBP_QUALITY, method=6)
-    except Exception:
-        # WEBP is optional
-        webp_name = ""
+        jpg_f.result()
+        webp_name = webp_f.result()
+        thumb_f.result()
+    except BaseException:
+        wait((jpg_f, webp_f, thumb_f))
+        for part in (jpg_path, webp_path, thumb_path, micro_path, thumb_webp_path):
+            part.unlink(missing_ok=True)
+        raise
+
+    for name, part in ((jpg_name, jpg_path), (webp_name, webp_path),
+                       (thumb_name, thumb_path), (micro_name, micro_path)):
+        if name:
+            os.replace(part, UPLOAD_DIR / name)
+        else:
+            part.unlink(missing_ok=True)  # a failed optional WEBP
+    if thumb_webp_path.exists():
+        os.replace(thumb_webp_path, UPLOAD_DIR / thumb_webp_name)
+
+    return jpg_name, webp_name, thumb_name, micro_name
+
+
+def _thumb_webp_name(thumb_name: str) -> str | None:
+    """The WEBP twin of a <stem>.thumb.jpg (not listed in the DB; may not exist)."""
+    if isinstance(thumb_name, str) and thumb_name.endswith(".thumb.jpg"):
+        return thumb_name[: -len(".jpg")] + ".webp"
+    return None
 
-    # thumbnail
-    t = img.copy()
-    t.thumbnail((THUMB_DIM, THUMB_DIM))
-    t.save(thumb_path, format="JPEG", quality=85, optimize=True)
 
-    return jpg_name, webp_name, thumb_name
+def _dms_to_deg(dms, ref) -> float:
+    # Pillow gives IFDRational components, which convert with float() directly.
+    deg = float(dms[0]) + float(dms[1]) / 60.0 + float(dms[2]) / 3600.0
+    return -deg if ref in ("S", "W") else deg
 
 
-def _exif_gps_from_pil(img: Image.Image):
-    """Return (lat, lon, alt, acc) where acc is unknown (None)."""
+def _exif_gps_from_pil(exif: Image.Exif):
+    """Return (lat, lon, alt, acc) from an image's EXIF, where acc is unknown (None)."""
     try:
-        exif = img.getexif()
         if not exif:
             return None, None, None, None
-        gps_info = exif.get(_EXIF_TAGS.get("GPSInfo"))
+        # The GPS sub-IFD: exif.get() only yields its offset in current Pillow.
+        gps_info = exif.get_ifd(_GPS_TAG)
         if not gps_info:
             return None, None, None, None
 
-        def _ratio_to_float(x):
-            try:
-                return float(x[0]) / float(x[1])
-            except Exception:
-                return float(x)
-
-        def _dms_to_deg(dms, ref):
-            d = _ratio_to_float(dms[0])
-            m = _ratio_to_float(dms[1])
-            s = _ratio_to_float(dms[2])
-            deg = d + (m / 60.0) + (s / 3600.0)
-            if ref in ("S", "W"):
-                deg = -deg
-            return deg
-
         lat = lon = alt = None
-        if 2 in gps_info and 1 in gps_info:  # GPSLatitude + ref
-            lat = _dms_to_deg(gps_info[2], gps_info[1])
-        if 4 in gps_info and 3 in gps_info:  # GPSLongitude + ref
-            lon = _dms_to_deg(gps_info[4], gps_info[3])
-        if 6 in gps_info:
-            alt = _ratio_to_float(gps_info[6])
+        if _GPS_LAT in gps_info and _GPS_LAT_REF in gps_info:
+            lat = _dms_to_deg(gps_info[_GPS_LAT], gps_info[_GPS_LAT_REF])
+        if _GPS_LON in gps_info and _GPS_LON_REF in gps_info:
+            lon = _dms_to_deg(gps_info[_GPS_LON], gps_info[_GPS_LON_REF])
+        if _GPS_ALT in gps_info:
+            alt = float(gps_info[_GPS_ALT])
         return lat, lon, alt, None
     except Exception:
         return None, None, None, None
@@ -519,22 +1079,25 @@ def form():
     last_type = request.args.get("last_type", type=str)
     last_row = None
     last_meta = None
+    last_pending = last_failed = 0
     if last_id and last_type and last_type in TYPE_META:
-        with get_db() as conn:
-            last_row = conn.execute(f"SELECT * FROM {last_type} WHERE id=?", (last_id,)).fetchone()
-            last_meta = TYPE_META[last_type]
+        last_row = get_db().execute(TYPE_META[last_type]["select_sql"], (last_id,)).fetchone()
+        last_meta = TYPE_META[last_type]
+        last_pending, last_failed = _staged_counts(last_type, last_id)
 
     selected = request.args.get("type") or (last_type if last_type in TYPE_META else None)
     if selected not in TYPE_META:
-        selected = next(iter(TYPE_META.keys()))
+        selected = DEFAULT_OTYPE
     g.current_type = selected
 
     prefill_by_type = session.get("prefill_by_type", {})
-    current_record_by_type = session.get("current_record_by_type", {})
+    # The current record per type lives in its own small session slot (cur_<type>).
+    current_record_by_type = {k: session[f"cur_{k}"] for k in TYPE_META if session.get(f"cur_{k}")}
 
     return render_template(
         "upload.html",
         last_row=last_row, last_type=last_type, last_meta=last_meta,
+        last_pending=last_pending, last_failed=last_failed,
         selected_type=selected,
         banner_title=make_banner_title(selected.capitalize()),
         NAV_LINKS=_nav_links(active="upload"),
@@ -553,43 +1116,69 @@ def exists():
 
     meta_values = _coerce_form_values(meta, request.form, allow_missing=True)
     # remove server-managed timestamps from match key
-    for k, fm in meta["field_meta"].items():
-        if fm.get("server_now"):
-            meta_values.pop(k, None)
+    for k in meta["server_now_cols"]:
+        meta_values.pop(k, None)
 
-    # Build a deterministic matching WHERE: all provided non-empty fields must match
-    where = []
+    # Build a deterministic matching WHERE: all provided non-empty fields must match.
+    # Columns are emitted in sorted order so the same field set always yields the
+    # same SQL text (and hits sqlite3's statement cache).
+    cols = []
     params = []
-    for col, v in meta_values.items():
+    for col, v in sorted(meta_values.items()):
         if v is None or str(v).strip() == "":
             continue
-        where.append(f'"{col}" = ?')
+        cols.append(col)
         params.append(v)
 
-    if not where:
+    if not cols:
         return jsonify({"exists": False, "id": None})
 
-    sql = f"SELECT id FROM {otype} WHERE " + " AND ".join(where) + " ORDER BY id DESC LIMIT 1"
-    row = get_db().execute(sql, params).fetchone()
+    row = get_db().execute(_exists_sql(otype, tuple(cols)), params).fetchone()
     return jsonify({"exists": row is not None, "id": int(row["id"]) if row else None})
 
 
+@lru_cache(maxsize=256)
+def _exists_sql(otype: str, cols: tuple[str, ...]) -> str:
+    """Newest id matching every one of `cols`; one string per (type, column set)."""
+    where = " AND ".join(f'"{c}" = ?' for c in cols)
+    return f"SELECT id FROM {otype} WHERE {where} ORDER BY id DESC LIMIT 1"
+
+
+def _coerce_timestamp(s: str) -> str:
+    # Users shouldn't need to enter timestamps; accept but coerce to ISO date-only if they do.
+    if len(s) == 19 and s[10] == "T" and _ISO_DATE.match(s[:10]):
+        s = s[:10]  # the stored form (Edit round-trip): skip dateutil
+    return parse_user_date(s) + "T00:00:00"
+
+
+# Non-empty, stripped text -> stored value, per form_kinds entry
+# (constant and radio fields are handled before this point).
+_COERCE = {
+    "date": parse_user_date,
+    "timestamp": _coerce_timestamp,
+    "upper": str.upper,
+    "text": str,
+}
+
+
 def _coerce_form_values(meta: dict, form, allow_missing: bool = False) -> dict:
     out = {}
     now_ts = now_timestamp()
 
-    for fdef in meta["input_fields"]:
-        _label, col, coltype = fdef[0], fdef[1], (fdef[2] if len(fdef) > 2 else "TEXT")
-        fm = meta["field_meta"].get(col, {})
-        t = str(coltype or "TEXT").strip().upper()
+    cols, kinds = meta["form_cols"], meta["form_kinds"]
+    constants, server_now = meta["form_constants"], meta["form_server_now"]
+
+    for i in range(len(cols)):
+        col = cols[i]
+        kind = kinds[i]
 
-        if fm.get("widget") == "constant":
-            out[col] = str(fm.get("constant_value") or "")
+        if kind == "constant":
+            out[col] = constants[i]
             continue
 
-        if fm.get("widget") == "radio":
+        if kind == "radio":
             selected = [str(v).strip() for v in form.getlist(col) if str(v).strip()]
-            out[col] = json.dumps(selected, ensure_ascii=False, separators=(",", ":")) if selected else (None if allow_missing else "")
+            out[col] = _json_dumps(selected) if selected else (None if allow_missing else "")
             continue
 
         raw = form.get(col)
@@ -601,22 +1190,19 @@ def _coerce_form_values(meta: dict, form, allow_missing: bool = False) -> dict:
             out[col] = None
             continue
 
-        if t == "DATE":
-            out[col] = parse_user_date(s)
-        elif t == "TIMESTAMP":
-            # Users shouldn't need to enter timestamps; accept but coerce to ISO date-only if they do.
-            out[col] = parse_user_date(s) + "T00:00:00"
-        elif fm.get("widget") == "uppercase" or t == "UPPERCASE":
-            out[col] = s.upper()
-        else:
-            out[col] = s
-
-        if fm.get("server_now"):
-            out[col] = now_ts
+        # server-stamped fields ignore whatever was typed (no need to parse it)
+        out[col] = now_ts if server_now[i] else _COERCE[kind](s)
 
     return out
 
 
+@lru_cache(maxsize=256)
+def _update_sql(otype: str, cols: tuple[str, ...]) -> str:
+    """UPDATE statement setting `cols` by id; one string per (type, column list)."""
+    sets = ", ".join(f'"{c}"=?' for c in cols)
+    return f"UPDATE {otype} SET {sets} WHERE id=?"
+
+
 @app.route("/submit", methods=["POST"])
 def submit():
     """Create (or duplicate) a new record and/or add an image to the current record (unchanged UX)."""
@@ -644,148 +1230,438 @@ def submit():
     # Create a new record row first (New Record)
     if action in ("new", "new_record", "newrecord", "metadata", "upload metadata"):
         rid = _insert_record_only(otype, meta, values, gps_lat, gps_lon, gps_alt, gps_acc)
-        session.setdefault("current_record_by_type", {})[otype] = rid
+        session[f"cur_{otype}"] = rid
         flash(f"Saved {meta['label']} ID {rid}")
         return redirect(url_for("form", last_id=rid, last_type=otype, type=otype))
 
     # Add image (may create record if needed)
     if action in ("add", "add_image", "add image", "upload image"):
-        rid = session.get("current_record_by_type", {}).get(otype)
-        if not rid:
-            rid = _insert_record_only(otype, meta, values, gps_lat, gps_lon, gps_alt, gps_acc)
-            session.setdefault("current_record_by_type", {})[otype] = rid
-
+        rid = session.get(f"cur_{otype}")
         if not photo or not getattr(photo, "filename", ""):
+            # checked before creating a record, so no empty record is left behind
             flash("No image selected.")
             return redirect(url_for("form", last_id=rid, last_type=otype, type=otype))
 
-        _attach_image(otype, rid, photo, gps_lat, gps_lon, gps_alt, gps_acc)
-        flash(f"Added image to {meta['label']} ID {rid}")
+        created = False
+        if not rid:
+            rid = _insert_record_only(otype, meta, values, gps_lat, gps_lon, gps_alt, gps_acc)
+            session[f"cur_{otype}"] = rid
+            created = True
+
+        result = _attach_image(otype, rid, photo, gps_lat, gps_lon, gps_alt, gps_acc, check_exists=not created)
+        flash(f"{meta['label']} ID {rid}: {_ATTACH_MESSAGES[result]}")
         return redirect(url_for("form", last_id=rid, last_type=otype, type=otype))
 
     # Update metadata for the current record (Upload tab behavior)
     if action in ("update_record", "update"):
-        rid = session.get("current_record_by_type", {}).get(otype)
+        rid = session.get(f"cur_{otype}")
         if not rid:
             rid = _insert_record_only(otype, meta, values, gps_lat, gps_lon, gps_alt, gps_acc)
-            session.setdefault("current_record_by_type", {})[otype] = rid
+            session[f"cur_{otype}"] = rid
 
         conn = get_db()
-        sets = []
+        cols = []
         params = []
         for col, v in values.items():
             if col in SYSTEM_COLUMNS:
                 continue
-            sets.append(f'"{col}"=?')
+            cols.append(col)
             params.append(v)
 
-        sets.append("date_last_saved=?")
+        cols.append("date_last_saved")
         params.append(now_timestamp())
 
         # Always allow storing GPS values when provided; schema always includes GPS columns.
         if gps_lat is not None and gps_lon is not None:
-            sets += ["gps_lat=?", "gps_lon=?", "gps_alt=?", "gps_acc=?"]
+            cols += ["gps_lat", "gps_lon", "gps_alt", "gps_acc"]
             params += [gps_lat, gps_lon, gps_alt, gps_acc]
 
         params.append(rid)
-        conn.execute(f"UPDATE {otype} SET {', '.join(sets)} WHERE id=?", params)
-        conn.commit()
+        with conn:
+            conn.execute(_update_sql(otype, tuple(cols)), params)
+        _count_rows.cache_clear()
         flash(f"Updated {meta['label']} ID {rid}")
         return redirect(url_for("form", last_id=rid, last_type=otype, type=otype))
 
     # Reset / copy-from behavior preserved by keeping existing JS+template
     # Fall back: treat as new record
     rid = _insert_record_only(otype, meta, values, gps_lat, gps_lon, gps_alt, gps_acc)
-    session.setdefault("current_record_by_type", {})[otype] = rid
+    session[f"cur_{otype}"] = rid
     flash(f"Saved {meta['label']} ID {rid}")
     return redirect(url_for("form", last_id=rid, last_type=otype, type=otype))
 
 
 def _insert_record_only(otype: str, meta: dict, values: dict, gps_lat, gps_lon, gps_alt, gps_acc) -> int:
     conn = get_db()
+    params = [values.get(c) for c in meta["insert_cols"]]
+    # system columns; GPS columns always exist in the schema, include them in every insert.
+    params += ["[]", "[]", "[]", "[]", "[]", now_timestamp(), gps_lat, gps_lon, gps_alt, gps_acc]
+    with conn:
+        cur = conn.execute(meta["insert_sql"], params)
+    _count_rows.cache_clear()
+    return int(cur.lastrowid)
 
-    cols = []
-    params = []
-    for col, val in values.items():
-        if col in SYSTEM_COLUMNS:
-            # keep explicit date_recorded/date_updated if present
-            if col in ("date_recorded", "date_updated", "date_last_saved"):
-                cols.append(col)
-                params.append(val)
-            continue
-        cols.append(f'"{col}"')
-        params.append(val)
 
-    # system columns
-    cols += ["thumbs_json", "images_json", "webps_json", "json_files_json", "date_last_saved"]
-    params += ["[]", "[]", "[]", "[]", now_timestamp()]
+_IMAGE_POOL: ThreadPoolExecutor | None = None
+_IMAGE_POOL_PID = 0
+_IMAGE_POOL_LOCK = threading.Lock()
 
-    # GPS columns always exist in the schema; include them in every insert.
-    cols += ["gps_lat", "gps_lon", "gps_alt", "gps_acc"]
-    params += [gps_lat, gps_lon, gps_alt, gps_acc]
 
-    placeholders = ",".join(["?"] * len(cols))
-    sql = f"INSERT INTO {otype} ({', '.join(cols)}) VALUES ({placeholders})"
-    cur = conn.execute(sql, params)
-    conn.commit()
-    return int(cur.lastrowid)
+def _image_pool() -> ThreadPoolExecutor:
+    # Per process, like _encode_pool().
+    global _IMAGE_POOL, _IMAGE_POOL_PID
+    if _IMAGE_POOL is None or _IMAGE_POOL_PID != os.getpid():
+        with _IMAGE_POOL_LOCK:
+            if _IMAGE_POOL is None or _IMAGE_POOL_PID != os.getpid():
+                _IMAGE_POOL = ThreadPoolExecutor(max_workers=IMAGE_WORKERS, thread_name_prefix="artcap-img")
+                _IMAGE_POOL_PID = os.getpid()
+    return _IMAGE_POOL
 
 
-def _attach_image(otype: str, rid: int, file_storage, gps_lat, gps_lon, gps_alt, gps_acc):
-    conn = get_db()
-    row = conn.execute(f"SELECT * FROM {otype} WHERE id=?", (rid,)).fetchone()
-    if not row:
-        raise RuntimeError("Record not found")
-
-    raw_bytes = file_storage.read()
-    img = Image.open(BytesIO(raw_bytes))
-
-    exif_lat, exif_lon, exif_alt, exif_acc = _exif_gps_from_pil(img)
-    if GPS_ENABLED and (gps_lat is None or gps_lon is None):
-        gps_lat, gps_lon, gps_alt, gps_acc = exif_lat, exif_lon, exif_alt, exif_acc
-
-    stem = f"{otype}-{rid}-{int(time.time())}"
-    jpg_name, webp_name, thumb_name = _save_derivatives(img, stem)
-
-    def _append_json_list(colname, val):
-        arr = json.loads(row[colname] or "[]")
-        if not isinstance(arr, list):
-            arr = []
-        arr.append(val)
-        return json.dumps(arr, ensure_ascii=False, separators=(",", ":"))
-
-    thumbs_json = _append_json_list("thumbs_json", thumb_name)
-    images_json = _append_json_list("images_json", jpg_name)
-    webps_json = _append_json_list("webps_json", webp_name) if webp_name else row["webps_json"]
-
-    upd_cols = {
-        "thumbs_json": thumbs_json,
-        "images_json": images_json,
-        "webps_json": webps_json,
-        "date_last_saved": now_timestamp(),
-    }
-    if gps_lat is not None and gps_lon is not None:
-        upd_cols.update({"gps_lat": gps_lat, "gps_lon": gps_lon, "gps_alt": gps_alt, "gps_acc": gps_acc})
+_PROCESS_POOL: ProcessPoolExecutor | None = None
+_PROCESS_POOL_PID = 0
+
+
+def _process_pool() -> ProcessPoolExecutor:
+    # Created under _IMAGE_POOL_LOCK; forkserver children start clean (no copied
+    # threads or DB connections) and import this module once. Per process, like
+    # _encode_pool(): a forked web worker cannot use its parent's pool.
+    global _PROCESS_POOL, _PROCESS_POOL_PID
+    if _PROCESS_POOL is None or _PROCESS_POOL_PID != os.getpid():
+        with _IMAGE_POOL_LOCK:
+            if _PROCESS_POOL is None or _PROCESS_POOL_PID != os.getpid():
+                methods = multiprocessing.get_all_start_methods()
+                ctx = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+                _PROCESS_POOL = ProcessPoolExecutor(max_workers=IMAGE_PROCESSES, mp_context=ctx)
+                _PROCESS_POOL_PID = os.getpid()
+    return _PROCESS_POOL
+
+
+def _attach_image(otype: str, rid: int, file_storage, gps_lat, gps_lon, gps_alt, gps_acc, check_exists: bool = True):
+    """Stage an uploaded image and queue its derivatives for the record.
+
+    The raw upload is written to STAGING_DIR and the request returns right away;
+    a background worker saves JPG/WEBP/thumb and appends them to the record's
+    image lists, so new images show up in images_json shortly afterwards.
+    Pass check_exists=False for a record inserted by this same request.
+    Returns "queued", or with IMAGE_WORKERS=0 (processed inline) "done"/"failed".
+    """
+    if check_exists:
+        row = get_db().execute(TYPE_META[otype]["id_sql"], (rid,)).fetchone()
+        if not row:
+            raise RuntimeError("Record not found")
+
+    # The token keeps two uploads to one record in the same second apart.
+    stem = f"{otype}-{rid}-{int(time.time())}-{secrets.token_hex(3)}"
+    STAGING_DIR.mkdir(parents=True, exist_ok=True)
+    fd, staged = tempfile.mkstemp(prefix=f"{stem}-", suffix=".upload", dir=str(STAGING_DIR))
+    staged = Path(staged)
+    # Copy the upload stream straight to disk (Werkzeug has usually spooled it to
+    # a temp file already) rather than materialising it as one bytes object.
+    with os.fdopen(fd, "wb") as fh:
+        file_storage.save(fh)
+    try:
+        with Image.open(staged):
+            pass  # reads the header only; rejects non-images up front
+    except Exception:
+        staged.unlink(missing_ok=True)
+        raise
+
+    gps = [gps_lat, gps_lon, gps_alt, gps_acc]
+    if any(v is not None for v in gps):
+        # kept beside the staged file so _recover_staged() can re-queue the job as sent
+        staged.with_suffix(".job").write_bytes(_json_dumpb({"gps": gps}))
+
+    job = (otype, rid, staged, stem, gps_lat, gps_lon, gps_alt, gps_acc)
+    if IMAGE_WORKERS > 0:
+        _image_pool().submit(_process_upload, *job)
+        return "queued"
+    return "done" if _process_upload(*job) else "failed"
+
+
+# What to tell the user after _attach_image, by its result.
+_ATTACH_MESSAGES = {
+    "queued": "Image queued for processing; it will appear shortly.",
+    "done": "Added image.",
+    "failed": "The image could not be processed.",
+}
+
+
+def _json_append_sql(col: str) -> str:
+    return f"{col} = json_insert(CASE WHEN json_type({col}) = 'array' THEN {col} ELSE '[]' END, '$[#]', ?)"
+
+
+def _process_upload(otype: str, rid: int, staged: Path, stem: str, gps_lat, gps_lon, gps_alt, gps_acc) -> bool:
+    """Build derivatives for a staged upload and append them to the record (runs off-request).
+
+    A staged file moves <name>.upload (queued) -> .working (claimed by one
+    worker) -> deleted on success, or renamed .failed so the capture page can
+    say so. A <name>.job file beside it holds the browser-sent GPS for
+    _recover_staged(). See _staged_counts(). Returns True on success.
+    """
+    sidecar = staged.with_suffix(".job")
+    working = staged.with_suffix(".working")
+    try:
+        os.rename(staged, working)
+    except FileNotFoundError:
+        return False  # claimed by another worker (e.g. re-queued by _recover_staged)
+    os.utime(working)  # claim time, for spotting jobs lost with their worker
+    staged = working
+    ok = False
+    try:
+        # The photo's own GPS is only read when it would be used.
+        want_gps = GPS_ENABLED and (gps_lat is None or gps_lon is None)
+        if IMAGE_PROCESSES > 0:
+            # The CPU-heavy part runs in another process, so it doesn't hold this
+            # process's GIL while requests are being served.
+            names, exif_gps = _process_pool().submit(_encode_upload, staged, stem, want_gps).result()
+        else:
+            names, exif_gps = _encode_upload(staged, stem, want_gps)
+        jpg_name, webp_name, thumb_name, micro_name = names
+        if want_gps:
+            gps_lat, gps_lon, gps_alt, gps_acc = exif_gps
+
+        # Append to the JSON lists inside SQLite (JSON1) in one UPDATE: no
+        # read/parse/serialise round-trip, and concurrent appends can't clobber
+        # each other. A missing/non-array list starts over as [].
+        sets = [_json_append_sql("thumbs_json"), _json_append_sql("images_json"), _json_append_sql("micros_json")]
+        params = [thumb_name, jpg_name, micro_name]
+        if webp_name:
+            sets.append(_json_append_sql("webps_json"))
+            params.append(webp_name)
+        sets.append("date_last_saved=?")
+        params.append(now_timestamp())
+        if gps_lat is not None and gps_lon is not None:
+            sets += ["gps_lat=?", "gps_lon=?", "gps_alt=?", "gps_acc=?"]
+            params += [gps_lat, gps_lon, gps_alt, gps_acc]
+
+        conn = _checkout_db()
+        try:
+            with conn:
+                cur = conn.execute(f"UPDATE {otype} SET {', '.join(sets)} WHERE id=?", params + [rid])
+        finally:
+            _checkin_db(conn)
+
+        if cur.rowcount == 0:
+            # record was deleted while we were working
+            for fname in (jpg_name, webp_name, thumb_name, micro_name, _thumb_webp_name(thumb_name)):
+                if fname:
+                    (UPLOAD_DIR / fname).unlink(missing_ok=True)
+        ok = True
+    except Exception:
+        app.logger.exception("Failed to process image for %s %s", otype, rid)
+    finally:
+        if ok:
+            staged.unlink(missing_ok=True)
+        else:
+            try:
+                os.replace(staged, staged.with_suffix(".failed"))
+            except OSError:
+                staged.unlink(missing_ok=True)
+        sidecar.unlink(missing_ok=True)  # a .failed upload is never retried
+    return ok
+
+
+# Staged files are named <type>-<id>-<time>[-<token>]-<random>.<state>.
+_STAGED_RE = re.compile(r"^(?P<stem>(?P<otype>.+?)-(?P<rid>\d+)-\d+(?:-[0-9a-f]+)?)-[^-]+$")
+# An .upload or .working file this old belonged to a worker that went away
+# before finishing the job; younger ones may be queued in a live worker.
+_STAGED_STALE_SECONDS = 3600
+# Failed uploads are reported on the capture page for this long, then dropped.
+_STAGED_FAILED_KEEP_SECONDS = 7 * 86400
+
+
+def _staged_counts(otype: str, rid: int) -> tuple[int, int]:
+    """(still processing, failed) staged uploads for a record."""
+    pending = failed = 0
+    try:
+        for p in STAGING_DIR.glob(f"{otype}-{rid}-*"):
+            if p.suffix in (".upload", ".working"):
+                pending += 1
+            elif p.suffix == ".failed":
+                failed += 1
+    except OSError:
+        pass
+    return pending, failed
+
+
+def _recover_staged():
+    """Pass over STAGING_DIR: re-queue stale uploads whose job never ran (or
+    died with its worker), drop stray .part/.job files and old failures.
+
+    Re-queued jobs get the GPS sent with the original request from the
+    upload's .job file. Several workers may run this at once: _process_upload()
+    claims a file by renaming it, so each upload is processed only once.
+    """
+    try:
+        entries = list(STAGING_DIR.iterdir())
+    except OSError:
+        return
+    now = time.time()
+    for p in entries:
+        try:
+            age = now - p.stat().st_mtime
+            if p.suffix == ".part":
+                if age > _STAGED_STALE_SECONDS:
+                    p.unlink(missing_ok=True)
+                continue
+            if p.suffix == ".failed":
+                if age > _STAGED_FAILED_KEEP_SECONDS:
+                    p.unlink(missing_ok=True)
+                continue
+            if p.suffix == ".job":
+                if age > _STAGED_STALE_SECONDS and not any(
+                    p.with_suffix(s).exists() for s in (".upload", ".working")
+                ):
+                    p.unlink(missing_ok=True)
+                continue
+            if p.suffix not in (".upload", ".working") or age <= _STAGED_STALE_SECONDS:
+                continue  # a live worker may still have it queued or in hand
+            if p.suffix == ".working":
+                p = p.rename(p.with_suffix(".upload"))
+            m = _STAGED_RE.match(p.stem)
+            if not m or m.group("otype") not in TYPE_META:
+                app.logger.warning("Removing unrecognised staged upload %s", p.name)
+                p.unlink(missing_ok=True)
+                p.with_suffix(".job").unlink(missing_ok=True)
+                continue
+            gps = [None] * 4
+            try:
+                sent = _json_loads(p.with_suffix(".job").read_bytes())["gps"]
+                if not isinstance(sent, list) or len(sent) != 4:
+                    raise ValueError(sent)
+                gps = sent
+            except FileNotFoundError:
+                pass
+            except (ValueError, KeyError, TypeError):
+                app.logger.warning("Ignoring unreadable job file for %s", p.name)
+            job = (m.group("otype"), int(m.group("rid")), p, m.group("stem"), *gps)
+            if IMAGE_WORKERS > 0:
+                _image_pool().submit(_process_upload, *job)
+            else:
+                _process_upload(*job)
+        except OSError:
+            continue
+
+
+def _encode_upload(staged: Path, stem: str, want_gps: bool = True):
+    """Write the derivatives of a staged upload; returns (names, exif GPS).
 
-    sets = ", ".join([f"{k}=?" for k in upd_cols.keys()])
-    conn.execute(f"UPDATE {otype} SET {sets} WHERE id=?", list(upd_cols.values()) + [rid])
-    conn.commit()
+    Module-level and free of request/DB state so it can run in _process_pool().
+    With want_gps False the GPS sub-IFD is never parsed and the GPS is all None.
+    """
+    with Image.open(staged) as img:
+        # One EXIF parse serves both the GPS lookup and orientation.
+        exif = img.getexif()
+        gps = _exif_gps_from_pil(exif) if want_gps else (None, None, None, None)
+        return _save_derivatives(img, stem, exif, staged), gps
 
 
 @app.route("/uploads/<path:fname>")
 def serve_upload(fname):
-    return send_from_directory(str(UPLOAD_DIR), fname, as_attachment=False)
+    # With ARTCAP_USE_X_SENDFILE=on Flask only emits an X-Sendfile header and the
+    # web server does the (zero-copy) transfer; see extras/artifact-capture.conf.
+    # Derivatives are written once per upload and afterwards only deleted, so
+    # browsers may keep them for a year without revalidating.
+    # Nothing hidden is published (dotfiles, or a staging area someone pointed
+    # inside UPLOAD_DIR).
+    if any(part.startswith(".") for part in fname.replace("\\", "/").split("/")):
+        abort(404)
+    etag = None
+    # Thumbnails have a smaller WEBP twin; hand it to browsers that take WEBP.
+    # Only an explicit image/webp counts: `in accept_mimetypes` also matches
+    # */* and image/*, which clients send without being able to decode WEBP.
+    negotiated = fname.endswith(".thumb.jpg")
+    if negotiated and any(m == "image/webp" and q > 0 for m, q in request.accept_mimetypes):
+        twin = _thumb_webp_name(fname)
+        path = safe_join(str(UPLOAD_DIR), twin)
+        if path is not None:
+            try:
+                etag = _upload_etag(path)
+                fname = twin
+            except OSError:
+                pass  # older upload without one
+    path = safe_join(str(UPLOAD_DIR), fname)
+    if path is not None and etag is None:
+        try:
+            etag = _upload_etag(path)
+        except OSError:
+            pass  # missing: send_from_directory answers 404
+    if etag is not None and request.if_none_match.contains(etag):
+        resp = Response(status=304)
+        resp.set_etag(etag)
+    else:
+        resp = send_from_directory(str(UPLOAD_DIR), fname, as_attachment=False, max_age=31536000, etag=etag or True)
+    resp.cache_control.public = True
+    resp.cache_control.max_age = 31536000
+    resp.cache_control.immutable = True
+    if negotiated:
+        resp.vary.add("Accept")
+    return resp
+
+
+@lru_cache(maxsize=4096)
+def _upload_etag(path: str) -> str:
+    # Revalidations are answered from this cache without touching the file.
+    # Misses raise (and so aren't cached); deletes call cache_clear().
+    st = os.stat(path)
+    return f"{st.st_mtime_ns:x}-{st.st_size:x}"
 
 
 # -----------------------------------------------------------------------------
 # Browse (merged Recent+Review)
 # -----------------------------------------------------------------------------
 
+# A JSON array of plain strings (no escapes), e.g. '"a", "b"' inside the brackets.
+_QUOTED_LIST_RE = re.compile(r'\s*"[^"\\]*"\s*(?:,\s*"[^"\\]*"\s*)*')
+_QUOTED_ITEM_RE = re.compile(r'"([^"\\]*)"')
+
+
+@lru_cache(maxsize=4096)
+def _parse_bracket_list(s: str) -> str:
+    """Display form of a stored value: '["a","b"]' (radio fields) -> 'a, b'."""
+    if len(s) < 2 or s[0] != "[" or s[-1] != "]":
+        return s
+    inner = s[1:-1].strip()
+    if "\\" not in inner and "[" not in inner and "{" not in inner:
+        # Common shapes parse without the JSON scanner: quoted strings (what
+        # radio fields store) or bare comma-separated primitives.
+        if _QUOTED_LIST_RE.fullmatch(inner):
+            return ", ".join([x for x in _QUOTED_ITEM_RE.findall(inner) if x.strip()])
+        if '"' not in inner:
+            return ", ".join([x.strip() for x in inner.split(",") if x.strip()])
+    try:
+        arr = _json_loads(s)
+    except ValueError:
+        return s
+    if isinstance(arr, list):
+        return ", ".join([str(x) for x in arr if str(x).strip()])
+    return s
+
+
+def _db_stamp() -> tuple:
+    """Cheap change marker for the database: moves on any commit, from any process."""
+    out = []
+    for p in (DB_PATH, DB_PATH.with_name(DB_PATH.name + "-wal")):
+        try:
+            st = os.stat(p)
+            out += [st.st_mtime_ns, st.st_size]
+        except OSError:
+            out += [0, 0]
+    return tuple(out)
+
+
+@lru_cache(maxsize=64)
+def _count_rows(otype: str, where_sql: str, params: tuple, stamp: tuple) -> int:
+    # `stamp` only keys the cache; our own writes also call cache_clear().
+    return get_db().execute(f"SELECT COUNT(*) FROM {otype}{where_sql}", params).fetchone()[0]
+
+
 @app.route("/browse")
 def browse():
     otype = (request.args.get("type") or "").strip().lower()
     if otype not in TYPE_META:
-        otype = next(iter(TYPE_META.keys()))
+        otype = DEFAULT_OTYPE
     g.current_type = otype
     meta = TYPE_META[otype]
 
@@ -824,59 +1700,38 @@ def browse():
         params.append("[]")
 
     if q:
-        # generic LIKE search across user fields + id
+        # generic substring search across user fields + id
         like = f"%{q}%"
-        or_terms = ['CAST(id AS TEXT) LIKE ?']
         params.append(like)
-        for col in meta["field_meta"].keys():
-            if col in ("thumbs_json", "images_json", "webps_json", "json_files_json"):
-                continue
-            or_terms.append(f'CAST("{col}" AS TEXT) LIKE ?')
-            params.append(like)
-        where_clauses.append("(" + " OR ".join(or_terms) + ")")
+        if otype in _FTS_TABLES and len(q) >= 3:
+            # trigram index lookup; the query is passed as one quoted FTS5 phrase
+            where_clauses.append(
+                f"(CAST(id AS TEXT) LIKE ? OR id IN (SELECT rowid FROM {otype}_fts WHERE {otype}_fts MATCH ?))"
+            )
+            params.append('"' + q.replace('"', '""') + '"')
+        else:
+            where_clauses.append(f"(CAST(id AS TEXT) LIKE ?{meta['search_like_sql']})")
+            params += [like] * meta["search_like_count"]
 
     where_sql = (" WHERE " + " AND ".join(where_clauses)) if where_clauses else ""
 
-    conn = get_db()
-    # Fetch all matching rows first, then paginate in Python. This keeps pagination stable
-    # for grouped/index views (and matches legacy Review behavior more closely).
-    all_rows = conn.execute(
-        f"SELECT * FROM {otype}{where_sql}",
-        params
-    ).fetchall()
-
-    def _group_key(r):
-        if not field:
-            return ""
-        v = r[field] if field in r.keys() else ""
-        if v is None:
-            s = ""
-        else:
-            s = str(v).strip()
-        if s.startswith("[") and s.endswith("]"):
-            try:
-                arr = json.loads(s)
-                if isinstance(arr, list):
-                    s = ", ".join([str(x) for x in arr if str(x).strip()])
-            except Exception:
-                pass
-        return s.strip() or "(no value)"
-
-    if mode == "recent":
-        all_rows = sorted(all_rows, key=lambda r: int(r["id"]), reverse=True)
+    if mode == "recent" or not field:
+        order_sql = " ORDER BY id DESC"
     else:
-        # index mode: sort by the displayed group key, then newest within group
-        all_rows = sorted(
-            all_rows,
-            key=lambda r: (
-                1 if _group_key(r) == "(no value)" else 0,
-                _group_key(r).lower(),
-                -int(r["id"])
-            )
-        )
+        # index mode: sort by the displayed group value, then newest within group
+        order_sql = f' ORDER BY LOWER(TRIM(CAST("{field}" AS TEXT))), id DESC'
 
-    total = len(all_rows)
-    rows = all_rows[offset: offset + per_page]
+    conn = get_db()
+    # Paginate in SQL: only the rows for this page leave SQLite, and the pager
+    # total comes from a separate COUNT(*), reused until the data changes.
+    total = _count_rows(otype, where_sql, tuple(params), _db_stamp())
+    rows = conn.execute(
+        f"SELECT * FROM {otype}{where_sql}{order_sql} LIMIT ? OFFSET ?",
+        params + [per_page, offset]
+    ).fetchall()
+    # Plain dicts for the page: grouping and the templates look columns up
+    # by name (and test `col in r.keys()`) many times per row.
+    rows = [dict(r) for r in rows]
 
     start_n = offset + 1 if total and rows else 0
     end_n = offset + len(rows) if total and rows else 0
@@ -896,30 +1751,27 @@ def browse():
     if mode == "recent" or not field:
         groups = [("Recent" if mode == "recent" else "", rows)]
     else:
-        tmp = collections.defaultdict(list)
+        # Every row has the same columns: check once, and bind the helpers
+        # used per row to locals.
+        has_field = bool(rows) and field in rows[0].keys()
+        _parse = _parse_bracket_list
+
+        def _group_key(r):
+            v = r[field] if has_field else None
+            s = "" if v is None else str(v).strip()
+            return (_parse(s) if s else "") or "(no value)"
+
+        # Rows arrive sorted by the group value (SQL ORDER BY), so groups are
+        # built in a single pass and keep that order; the dict only merges
+        # the rare keys that differ in case or JSON-list form.
+        by_key: dict[str, list] = {}
         for r in rows:
-            v = r[field] if field in r.keys() else ""
-            key = ""
-            if v is None:
-                key = ""
-            else:
-                s = str(v).strip()
-                if s.startswith("[") and s.endswith("]"):
-                    try:
-                        arr = json.loads(s)
-                        if isinstance(arr, list):
-                            key = ", ".join([str(x) for x in arr if str(x).strip()])
-                        else:
-                            key = s
-                    except Exception:
-                        key = s
-                else:
-                    key = s
-            if not key:
-                key = "(no value)"
-            tmp[key].append(r)
-        for k in sorted(tmp.keys(), key=lambda x: x.lower()):
-            groups.append((k, tmp[k]))
+            key = _group_key(r)
+            lst = by_key.get(key)
+            if lst is None:
+                lst = by_key[key] = []
+                groups.append((key, lst))
+            lst.append(r)
 
     return render_template(
         "index.html",
@@ -960,7 +1812,7 @@ def admin_edit(otype, aid):
     meta = TYPE_META[otype]
 
     conn = get_db()
-    row = conn.execute(f"SELECT * FROM {otype} WHERE id=?", (aid,)).fetchone()
+    row = conn.execute(meta["select_sql"], (aid,)).fetchone()
     if not row:
         flash("Record not found.")
         return redirect(url_for("browse", type=otype))
@@ -969,21 +1821,22 @@ def admin_edit(otype, aid):
         # Update only fields present in form
         values = _coerce_form_values(meta, request.form, allow_missing=True)
 
-        sets = []
+        cols = []
         params = []
         for col, v in values.items():
             if col in SYSTEM_COLUMNS:
                 continue
-            sets.append(f'"{col}"=?')
+            cols.append(col)
             params.append(v)
         # server-managed timestamp
-        sets.append("date_last_saved=?")
+        cols.append("date_last_saved")
         params.append(now_timestamp())
 
-        if sets:
+        if cols:
             params.append(aid)
-            conn.execute(f"UPDATE {otype} SET {', '.join(sets)} WHERE id=?", params)
-            conn.commit()
+            with conn:
+                conn.execute(_update_sql(otype, tuple(cols)), params)
+            _count_rows.cache_clear()
             flash("Saved.")
         return redirect(url_for("admin_edit", otype=otype, aid=aid))
 
@@ -994,6 +1847,7 @@ def admin_edit(otype, aid):
         # Keep template compatibility: older templates expect `r`.
         r=row,
         row=row,
+        staged_counts=_staged_counts(otype, aid),
         banner_title=f"{meta['label']} {aid}",
         NAV_LINKS=_nav_links(active="browse"),
     )
@@ -1018,8 +1872,7 @@ def admin_add_image(otype, aid):
     gps_acc = request.form.get("gps_acc", type=float)
 
     try:
-        _attach_image(otype, aid, photo, gps_lat, gps_lon, gps_alt, gps_acc)
-        flash("Added image.")
+        flash(_ATTACH_MESSAGES[_attach_image(otype, aid, photo, gps_lat, gps_lon, gps_alt, gps_acc)])
     except Exception as e:
         flash(f"Failed to add image: {e}")
 
@@ -1034,16 +1887,24 @@ def admin_delete(otype, aid):
         return redirect(url_for("browse"))
 
     conn = get_db()
-    row = conn.execute(f"SELECT * FROM {otype} WHERE id=?", (aid,)).fetchone()
+    # Read the file lists and delete the row under one write lock, so an image
+    # the background worker appends in between can't be orphaned on disk.
+    with conn:
+        conn.execute("BEGIN IMMEDIATE")
+        row = conn.execute(TYPE_META[otype]["files_sql"], (aid,)).fetchone()
+        if row:
+            conn.execute(TYPE_META[otype]["delete_sql"], (aid,))
     if not row:
         flash("Record not found.")
         return redirect(url_for("browse", type=otype))
 
     # Remove attached files
-    for col in ("thumbs_json", "images_json", "webps_json", "json_files_json"):
+    for col in ("thumbs_json", "images_json", "webps_json", "json_files_json", "micros_json"):
         try:
-            arr = json.loads(row[col] or "[]")
+            arr = _json_loads(row[col] or "[]")
             if isinstance(arr, list):
+                if col == "thumbs_json":
+                    arr = arr + [_thumb_webp_name(t) for t in arr]
                 for fname in arr:
                     if fname:
                         try:
@@ -1053,8 +1914,8 @@ def admin_delete(otype, aid):
         except Exception:
             pass
 
-    conn.execute(f"DELETE FROM {otype} WHERE id=?", (aid,))
-    conn.commit()
+    _count_rows.cache_clear()
+    _upload_etag.cache_clear()
     flash(f"Deleted {TYPE_META[otype]['label']} {aid}.")
     return redirect(url_for("browse", type=otype))
 
@@ -1064,7 +1925,7 @@ def recent():
     """Backward-compatible alias used by older templates: redirects to Browse (Recent mode)."""
     otype = (request.args.get("type") or request.args.get("otype") or "").strip().lower()
     if otype not in TYPE_META:
-        otype = next(iter(TYPE_META.keys()))
+        otype = DEFAULT_OTYPE
     view = (request.args.get("view") or "para").strip().lower()
     if view not in ("para", "table", "grid"):
         view = "para"
@@ -1076,33 +1937,59 @@ def admin_delete_image(otype, aid, idx):
     if otype not in TYPE_META:
         return jsonify({"ok": False})
     conn = get_db()
-    row = conn.execute(f"SELECT * FROM {otype} WHERE id=?", (aid,)).fetchone()
-    if not row:
-        return jsonify({"ok": False})
-
-    def _pop(colname):
-        arr = json.loads(row[colname] or "[]")
-        if not isinstance(arr, list) or idx < 0 or idx >= len(arr):
-            return row[colname]
-        removed = arr.pop(idx)
-        # try remove file on disk
-        if removed:
+    # The read-modify-write of the lists holds the write lock throughout, so an
+    # image the background worker appends meanwhile isn't overwritten.
+    with conn:
+        conn.execute("BEGIN IMMEDIATE")
+        row = conn.execute(TYPE_META[otype]["files_sql"], (aid,)).fetchone()
+        if not row:
+            return jsonify({"ok": False})
+        removed = _remove_image_entry(conn, otype, aid, row, idx)
+
+    # try remove files on disk
+    for fname in removed:
+        if fname:
             try:
-                (UPLOAD_DIR / removed).unlink(missing_ok=True)
+                (UPLOAD_DIR / fname).unlink(missing_ok=True)
             except Exception:
                 pass
-        return json.dumps(arr, ensure_ascii=False, separators=(",", ":"))
+    _upload_etag.cache_clear()
+    return jsonify({"ok": True})
+
 
-    thumbs_json = _pop("thumbs_json")
-    images_json = _pop("images_json")
-    webps_json = _pop("webps_json")
+def _remove_image_entry(conn: sqlite3.Connection, otype: str, aid: int, row, idx: int) -> list:
+    """Drop image `idx` from the record's lists; returns the file names to delete."""
+    # The lists are parallel (same index across them), but webps may be
+    # shorter when WEBP wasn't available, so each is bounds-checked on its own.
+    out = []
+    removed = []
+    for colname in ("thumbs_json", "images_json", "webps_json"):
+        arr = _json_loads(row[colname] or "[]")
+        if not isinstance(arr, list) or idx < 0 or idx >= len(arr):
+            out.append(row[colname])
+            continue
+        removed.append(arr.pop(idx))
+        out.append(_json_dumps(arr))
+    thumbs_json, images_json, webps_json = out
+
+    # Records from before micro-thumbnails existed have a shorter micros list,
+    # so the micro is matched by name (<stem>.micro.jpg beside <stem>.thumb.jpg).
+    micros_json = row["micros_json"]
+    if removed and isinstance(removed[0], str) and removed[0].endswith(".thumb.jpg"):
+        micro = removed[0][: -len(".thumb.jpg")] + ".micro.jpg"
+        micros = _json_loads(micros_json or "[]")
+        if isinstance(micros, list) and micro in micros:
+            micros.remove(micro)
+            micros_json = _json_dumps(micros)
+            removed.append(micro)
+    if removed:
+        removed.append(_thumb_webp_name(removed[0]))
 
     conn.execute(
-        f"UPDATE {otype} SET thumbs_json=?, images_json=?, webps_json=?, date_last_saved=? WHERE id=?",
-        (thumbs_json, images_json, webps_json, now_timestamp(), aid),
+        TYPE_META[otype]["set_images_sql"],
+        (thumbs_json, images_json, webps_json, micros_json, now_timestamp(), aid),
     )
-    conn.commit()
-    return jsonify({"ok": True})
+    return removed
 
 
 # -----------------------------------------------------------------------------
@@ -1113,34 +2000,39 @@ def admin_delete_image(otype, aid, idx):
 def admin_export_csv():
     otype = (request.args.get("type") or "").strip().lower()
     if otype not in TYPE_META:
-        otype = next(iter(TYPE_META.keys()))
+        otype = DEFAULT_OTYPE
     conn = get_db()
-    rows = conn.execute(f"SELECT * FROM {otype} ORDER BY id ASC").fetchall()
-    if not rows:
-        return Response("", mimetype="text/csv")
-
-    import csv
-    buf = BytesIO()
-    # write utf-8 with BOM for Excel friendliness
-    text = []
-    cols = rows[0].keys()
-    text.append(",".join([f'"{c}"' for c in cols]) + "\n")
-    for r in rows:
-        vals = []
-        for c in cols:
-            v = r[c]
-            if v is None:
-                vals.append("")
-            else:
-                s = str(v).replace('"', '""')
-                vals.append(f'"{s}"')
-        text.append(",".join(vals) + "\n")
-    data = "".join(text).encode("utf-8-sig")
+    # Plain tuples for the export: rows go straight to csv.writer with no
+    # per-cell lookup by column name. (Set on this cursor only; the pooled
+    # connection keeps sqlite3.Row.)
+    cur = conn.cursor()
+    cur.row_factory = None
+    cur.execute(TYPE_META[otype]["export_sql"])
+    cols = [d[0] for d in cur.description]
+
+    def generate():
+        # utf-8 with BOM for Excel friendliness; csv.writer does the quoting.
+        # Rows go out 256 to a chunk: bounded memory, few WSGI writes.
+        buf = io.StringIO()
+        w = csv.writer(buf)
+        w.writerow(cols)
+        yield "\ufeff" + buf.getvalue()
+        while True:
+            rows = cur.fetchmany(256)
+            if not rows:
+                break
+            buf.seek(0)
+            buf.truncate()
+            w.writerows(rows)
+            yield buf.getvalue()
+
     return Response(
-        data,
+        stream_with_context(generate()),
         mimetype="text/csv",
         headers={"Content-Disposition": f'attachment; filename="{otype}.csv"'}
     )
+
+
 @app.route("/admin/delete-image/<otype>/<int:aid>/<int:img_idx>", methods=["POST"])
 def admin_delete_image_compat(otype, aid, img_idx):
     # Backward-compatible alias for older templates that used img_idx.
@@ -1161,51 +2053,64 @@ def admin_import_csv():
         flash("No CSV selected.")
         return redirect(url_for("browse", type=otype))
 
-    import csv, io
     meta = TYPE_META[otype]
     allowed = set(meta["field_meta"].keys()) | SYSTEM_COLUMNS
 
-    raw = file.read().decode("utf-8-sig", errors="replace")
-    reader = csv.DictReader(io.StringIO(raw))
+    # Decode the upload as it is read instead of holding the whole file as
+    # bytes and again as str.
+    reader = csv.DictReader(
+        io.TextIOWrapper(file.stream, encoding="utf-8-sig", errors="replace", newline="")
+    )
     conn = get_db()
 
+    # One fixed column list for the whole file (taken from the header) so every
+    # row binds to the same prepared INSERT; date_last_saved is always ours.
+    cols = [k for k in (reader.fieldnames or [])
+            if k in allowed and k not in ("id", "date_last_saved")]
+    cols = list(dict.fromkeys(cols))
+    date_cols = meta["date_cols"]
+    col_sql = ", ".join(f'"{k}"' for k in cols + ["date_last_saved"])
+    placeholders = ",".join(["?"] * (len(cols) + 1))
+    sql = f"INSERT INTO {otype} ({col_sql}) VALUES ({placeholders})"
+    now = now_timestamp()
+
     inserted = 0
     bad_dates = []  # (csv_row_num, field, raw_value)
+    batch = []
 
     # csv.DictReader starts at first data row; for friendlier reporting we track row numbers
     csv_row_num = 1  # header line
-    for row in reader:
-        csv_row_num += 1
-        cols = []
-        params = []
-        for k, v in row.items():
-            if k not in allowed or k == "id":
-                continue
-            vv = (v or "").strip()
-
-            # Gentle DATE parsing: invalid dates are zapped (NULL) and reported.
-            if k in meta["field_meta"] and meta["field_meta"][k]["sql_type"].upper() == "DATE":
-                if vv:
-                    try:
-                        vv = parse_user_date(vv)
-                    except Exception:
-                        bad_dates.append((csv_row_num, k, vv))
+    # One transaction for the whole file (rolled back if any row fails).
+    with conn:
+        for row in reader:
+            csv_row_num += 1
+            params = []
+            for k in cols:
+                vv = (row.get(k) or "").strip()
+
+                # Gentle DATE parsing: invalid dates are zapped (NULL) and reported.
+                if k in date_cols:
+                    if vv:
+                        try:
+                            vv = parse_user_date(vv)
+                        except Exception:
+                            bad_dates.append((csv_row_num, k, vv))
+                            vv = None
+                    else:
                         vv = None
-                else:
-                    vv = None
 
-            cols.append(f'"{k}"')
-            params.append(vv if vv != "" else None)
+                params.append(vv if vv != "" else None)
 
-        cols.append("date_last_saved")
-        params.append(now_timestamp())
-
-        if cols:
-            placeholders = ",".join(["?"] * len(cols))
-            conn.execute(f"INSERT INTO {otype} ({', '.join(cols)}) VALUES ({placeholders})", params)
-            inserted += 1
-
-    conn.commit()
+            params.append(now)
+            batch.append(params)
+            if len(batch) >= 1000:
+                conn.executemany(sql, batch)
+                inserted += len(batch)
+                batch = []
+        if batch:
+            conn.executemany(sql, batch)
+            inserted += len(batch)
+    _count_rows.cache_clear()
 
     if bad_dates:
         # Show a short summary (avoid spamming flash)
@@ -1224,36 +2129,62 @@ def admin_import_csv():
 def admin_export_geojson():
     otype = (request.args.get("type") or "").strip().lower()
     if otype not in TYPE_META:
-        otype = next(iter(TYPE_META.keys()))
+        otype = DEFAULT_OTYPE
     conn = get_db()
-    rows = conn.execute(
-        f"SELECT * FROM {otype} WHERE gps_lat IS NOT NULL AND gps_lon IS NOT NULL ORDER BY id ASC"
-    ).fetchall()
+    cur = conn.cursor()
+    cur.row_factory = None
+    # Each row comes back as a finished Feature, built by SQLite's JSON1.
+    cur.execute(_geo_feature_sql(otype))
+
+    def generate():
+        # The FeatureCollection is written piecewise, ~256 features per chunk.
+        yield '{"type":"FeatureCollection","features":['
+        sep = ""
+        while True:
+            batch = cur.fetchmany(256)
+            if not batch:
+                break
+            yield sep + ",".join([r[0] for r in batch])
+            sep = ","
+        yield "]}"
 
-    features = []
-    for r in rows:
-        props = {k: r[k] for k in r.keys() if k not in ("gps_lat", "gps_lon", "gps_alt", "gps_acc")}
-        features.append({
-            "type": "Feature",
-            "geometry": {"type": "Point", "coordinates": [r["gps_lon"], r["gps_lat"]]},
-            "properties": props,
-        })
-
-    geo = {"type": "FeatureCollection", "features": features}
-    data = json.dumps(geo, ensure_ascii=False).encode("utf-8")
     return Response(
-        data,
+        stream_with_context(generate()),
         mimetype="application/geo+json",
         headers={"Content-Disposition": f'attachment; filename="{otype}.geojson"'}
     )
 
 
+@lru_cache(maxsize=None)
+def _geo_feature_sql(otype: str) -> str:
+    """SELECT producing one GeoJSON Feature (as JSON text) per geotagged row.
+
+    Properties are every column except the GPS ones, in table order. The
+    schema only changes at startup, so this is built once per type.
+    """
+    conn = get_db()
+    cols = [r[1] for r in conn.execute(f"PRAGMA table_info({otype})").fetchall()
+            if r[1] not in ("gps_lat", "gps_lon", "gps_alt", "gps_acc")]
+    # SQL functions take at most 127 arguments on older SQLite builds, so wide
+    # tables add their remaining columns through json_insert() in slices
+    # (json_patch() would drop NULL-valued properties).
+    props = "json_object(" + ", ".join(f"'{c}', \"{c}\"" for c in cols[:60]) + ")"
+    for i in range(60, len(cols), 60):
+        props = f"json_insert({props}, " + ", ".join(f"'$.{c}', \"{c}\"" for c in cols[i:i + 60]) + ")"
+    return (
+        "SELECT json_object('type', 'Feature', "
+        "'geometry', json_object('type', 'Point', 'coordinates', json_array(gps_lon, gps_lat)), "
+        f"'properties', {props}) "
+        f"FROM {otype} WHERE gps_lat IS NOT NULL AND gps_lon IS NOT NULL ORDER BY id ASC"
+    )
+
+
 @app.route("/admin/map")
 def admin_map():
     # retained: used for GPS browsing
     otype = (request.args.get("type") or "").strip().lower()
     if otype not in TYPE_META:
-        otype = next(iter(TYPE_META.keys()))
+        otype = DEFAULT_OTYPE
     meta = TYPE_META[otype]
     return render_template(
         "admin_map.html",
@@ -1278,7 +2209,29 @@ def info():
 
 @app.route("/favicon.ico")
 def favicon():
-    return send_from_directory(app.static_folder, "favicon.ico", mimetype="image/vnd.microsoft.icon")
+    return send_from_directory(app.static_folder, "favicon.ico", mimetype="image/vnd.microsoft.icon", max_age=86400)
+
+
+# Pick up uploads left in STAGING_DIR by a worker that stopped before
+# processing them. Run from the first request each worker serves (not at
+# import, so a gunicorn --preload master never starts pools before forking,
+# and _process_pool() children never run it) and again every
+# _STAGED_STALE_SECONDS, as uploads only become stale with time.
+_STAGED_SWEEP_AT = 0.0
+_STAGED_SWEEP_PID = 0
+
+
+@app.before_request
+def _sweep_staged():
+    global _STAGED_SWEEP_AT, _STAGED_SWEEP_PID
+    now = time.time()
+    if _STAGED_SWEEP_PID == os.getpid() and now < _STAGED_SWEEP_AT:
+        return
+    _STAGED_SWEEP_AT, _STAGED_SWEEP_PID = now + _STAGED_STALE_SECONDS, os.getpid()
+    if IMAGE_WORKERS > 0:
+        _image_pool().submit(_recover_staged)
+    else:
+        _recover_staged()
 
 
 # run(server='gunicorn', port=parmz.PORT)
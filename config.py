@@ -7,6 +7,9 @@
 #
 # widget is optional; for dropdowns use:
 #   'DROPDOWN('Option 1', 'Option 2')'
+# or, without any string parsing at startup:
+#   ('dropdown', ['Option 1', 'Option 2'])
+# (likewise RADIO(...) / ('radio', [...]) for multi-select checkboxes)
 #
 # Banner / UI config:
 APP_BRAND = 'TAP'